@@ -0,0 +1,31 @@
+"""cover auth identity lookup with user_id
+
+Revision ID: 0002_auth_identity_covering_index
+Revises: 0001_initial
+Create Date: 2025-01-02 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0002_auth_identity_covering_index"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_constraint("uq_auth_identity_provider_uid", "auth_identities", type_="unique")
+    op.create_index(
+        "uq_auth_identity_provider_uid",
+        "auth_identities",
+        ["provider", "provider_uid"],
+        unique=True,
+        postgresql_include=["user_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_auth_identity_provider_uid", table_name="auth_identities")
+    op.create_unique_constraint("uq_auth_identity_provider_uid", "auth_identities", ["provider", "provider_uid"])
@@ -0,0 +1,23 @@
+"""index auth identities by user
+
+Revision ID: 0003_auth_identities_user_id_index
+Revises: 0002_auth_identity_covering_index
+Create Date: 2025-01-03 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_auth_identities_user_id_index"
+down_revision = "0002_auth_identity_covering_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_auth_identities_user_id", "auth_identities", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_auth_identities_user_id", table_name="auth_identities")
@@ -0,0 +1,29 @@
+"""partial index on in-flight jobs
+
+Revision ID: 0004_jobs_active_index
+Revises: 0003_auth_identities_user_id_index
+Create Date: 2025-01-04 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_jobs_active_index"
+down_revision = "0003_auth_identities_user_id_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_jobs_active",
+        "jobs",
+        ["user_id", "created_at"],
+        postgresql_where=sa.text("status IN ('PENDING', 'RUNNING')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_active", table_name="jobs")
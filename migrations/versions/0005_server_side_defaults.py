@@ -0,0 +1,44 @@
+"""server-side defaults for ids and timestamps
+
+Revision ID: 0005_server_side_defaults
+Revises: 0004_jobs_active_index
+Create Date: 2025-01-05 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_server_side_defaults"
+down_revision = "0004_jobs_active_index"
+branch_labels = None
+depends_on = None
+
+# Timestamp columns are naive UTC, matching shared.db.utcnow().
+UTC_NOW = sa.text("timezone('utc', now())")
+RANDOM_UUID = sa.text("gen_random_uuid()")
+
+TIMESTAMP_COLUMNS = {
+    "users": ["created_at", "updated_at"],
+    "auth_identities": ["created_at"],
+    "sms_otps": ["created_at"],
+    "refresh_tokens": ["created_at"],
+    "collections": ["created_at", "updated_at"],
+    "problems": ["created_at", "updated_at"],
+    "jobs": ["created_at", "updated_at"],
+}
+
+
+def upgrade() -> None:
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        op.alter_column(table, "id", server_default=RANDOM_UUID)
+        for column in columns:
+            op.alter_column(table, column, server_default=UTC_NOW)
+
+
+def downgrade() -> None:
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, server_default=None)
+        op.alter_column(table, "id", server_default=None)
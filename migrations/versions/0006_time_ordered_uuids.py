@@ -0,0 +1,49 @@
+"""time-ordered uuid defaults for high-churn tables
+
+Revision ID: 0006_time_ordered_uuids
+Revises: 0005_server_side_defaults
+Create Date: 2025-01-06 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_time_ordered_uuids"
+down_revision = "0005_server_side_defaults"
+branch_labels = None
+depends_on = None
+
+UUID_V7_FUNCTION = """
+CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+    SELECT encode(
+        set_bit(
+            set_bit(
+                overlay(
+                    uuid_send(gen_random_uuid())
+                    PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6
+                ),
+                52, 1
+            ),
+            53, 1
+        ),
+        'hex'
+    )::uuid
+$$ LANGUAGE sql VOLATILE
+"""
+
+TABLES = ["problems", "jobs", "sms_otps", "refresh_tokens"]
+
+
+def upgrade() -> None:
+    op.execute(UUID_V7_FUNCTION)
+    for table in TABLES:
+        op.alter_column(table, "id", server_default=sa.text("uuid_generate_v7()"))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.alter_column(table, "id", server_default=sa.text("gen_random_uuid()"))
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
@@ -0,0 +1,55 @@
+"""store problem tags as text[] with a GIN index
+
+JSON arrays are copied element-wise and a scalar JSON string becomes a one-element array; SQL
+NULL and JSON null stay NULL. Any other shape (numbers, booleans, objects) aborts the upgrade
+with a count of the offending rows rather than being dropped.
+
+Revision ID: 0007_problem_tags_text_array
+Revises: 0006_time_ordered_uuids
+Create Date: 2025-01-07 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_problem_tags_text_array"
+down_revision = "0006_time_ordered_uuids"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    unconvertible = bind.execute(
+        sa.text(
+            "SELECT count(*) FROM problems "
+            "WHERE tags IS NOT NULL AND jsonb_typeof(tags) NOT IN ('array', 'string', 'null')"
+        )
+    ).scalar_one()
+    if unconvertible:
+        raise RuntimeError(
+            f"{unconvertible} problems rows have tags that are not a JSON array or string; fix them before upgrading"
+        )
+    # ALTER ... USING cannot contain subqueries, so convert through a staging column.
+    op.add_column("problems", sa.Column("tags_array", postgresql.ARRAY(sa.Text()), nullable=True))
+    op.execute(
+        "UPDATE problems SET tags_array = ARRAY(SELECT jsonb_array_elements_text(tags)) "
+        "WHERE jsonb_typeof(tags) = 'array'"
+    )
+    op.execute("UPDATE problems SET tags_array = ARRAY[tags #>> '{}'] WHERE jsonb_typeof(tags) = 'string'")
+    op.drop_column("problems", "tags")
+    op.alter_column("problems", "tags_array", new_column_name="tags")
+    op.create_index("ix_problems_tags", "problems", ["tags"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_problems_tags", table_name="problems")
+    op.alter_column(
+        "problems",
+        "tags",
+        type_=postgresql.JSONB(),
+        postgresql_using="to_jsonb(tags)",
+    )
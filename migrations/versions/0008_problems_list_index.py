@@ -0,0 +1,27 @@
+"""index for listing a collection's problems by recency
+
+Revision ID: 0008_problems_list_index
+Revises: 0007_problem_tags_text_array
+Create Date: 2025-01-08 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_problems_list_index"
+down_revision = "0007_problem_tags_text_array"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_problems_collection_user_updated_at",
+        "problems",
+        ["collection_id", "user_id", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_problems_collection_user_updated_at", table_name="problems")
@@ -0,0 +1,23 @@
+"""server-side default for problems.status so COPY ingest can omit it
+
+Revision ID: 0009_problem_status_default
+Revises: 0008_problems_list_index
+Create Date: 2025-01-09 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_problem_status_default"
+down_revision = "0008_problems_list_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column("problems", "status", server_default="DRAFT")
+
+
+def downgrade() -> None:
+    op.alter_column("problems", "status", server_default=None)
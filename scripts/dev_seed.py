@@ -1,31 +1,33 @@
-from datetime import datetime
-
+from shared.bulk import insert_problems
 from shared.db import get_session_factory
-from shared.models import Collection, Problem, User
+from shared.models import Collection, User
 
 
 SessionLocal = get_session_factory()
 
+PROBLEM_COUNT = 1
+
 
 def main():
-    session = SessionLocal()
-    user = User(nickname="seed-user")
-    session.add(user)
-    session.commit()
-    collection = Collection(user_id=user.id, name="Seed Collection", created_at=datetime.utcnow(), updated_at=datetime.utcnow())
-    session.add(collection)
-    session.commit()
-    problem = Problem(
-        user_id=user.id,
-        collection_id=collection.id,
-        status="DRAFT",
-        original_image_url="https://example.com/seed.png",
-        order_index=0,
-    )
-    session.add(problem)
-    session.commit()
-    print(f"seeded user={user.id} collection={collection.id} problem={problem.id}")
-    session.close()
+    with SessionLocal() as session, session.begin():
+        user = User(nickname="seed-user")
+        session.add(user)
+        session.flush()
+        collection = Collection(user_id=user.id, name="Seed Collection")
+        session.add(collection)
+        session.flush()
+        rows = [
+            {
+                "user_id": user.id,
+                "collection_id": collection.id,
+                "status": "DRAFT",
+                "original_image_url": "https://example.com/seed.png",
+                "order_index": index,
+            }
+            for index in range(PROBLEM_COUNT)
+        ]
+        insert_problems(session, rows)
+    print(f"seeded user={user.id} collection={collection.id} problems={len(rows)}")
 
 
 if __name__ == "__main__":
@@ -1,62 +1,87 @@
+import uuid
 from typing import Optional
 
 from fastapi import Depends, HTTPException, Request
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import bindparam, delete, insert, lambda_stmt, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from services.api.deps.db import get_db
+from shared.cache import get_cached_user_id, set_cached_user_id
 from shared.config import get_settings
 from shared.models import AuthIdentity, User
 
 
+_PROVIDER = get_settings().auth_provider_name
+
+# lambda_stmt caches on the lambda's code location, skipping cache-key generation per request.
+_IDENTITY_USER_ID_STMT = lambda_stmt(
+    lambda: select(AuthIdentity.user_id).where(
+        AuthIdentity.provider == bindparam("provider"),
+        AuthIdentity.provider_uid == bindparam("provider_uid"),
+    )
+)
+
+
+def _lookup_identity_user_id(db: Session, provider: str, provider_uid: str):
+    return db.execute(
+        _IDENTITY_USER_ID_STMT, {"provider": provider, "provider_uid": provider_uid}
+    ).scalar_one_or_none()
+
+
+def _provision_identity_user_id(db: Session, provider: str, provider_uid: str, claims: dict):
+    # One round-trip: insert the user and its identity together. On a concurrent first login the
+    # conflict branch returns the winning identity's user_id, and the user row we inserted is removed.
+    new_user = (
+        insert(User)
+        .values(nickname=claims.get("name"), avatar_url=claims.get("picture"))
+        .returning(User.id)
+        .cte("new_user")
+    )
+    identity = pg_insert(AuthIdentity).from_select(
+        ["user_id", "provider", "provider_uid"],
+        select(new_user.c.id, literal(provider), literal(provider_uid)),
+    )
+    identity = (
+        identity.on_conflict_do_update(
+            index_elements=[AuthIdentity.provider, AuthIdentity.provider_uid],
+            set_={"provider": identity.excluded.provider},
+        )
+        .returning(AuthIdentity.user_id)
+        .cte("identity")
+    )
+    user_id, new_user_id = db.execute(select(identity.c.user_id, new_user.c.id)).one()
+    if user_id != new_user_id:
+        db.execute(delete(User).where(User.id == new_user_id))
+    db.commit()
+    return user_id
+
+
 def get_current_user_id(request: Request, db: Session = Depends(get_db)) -> str:
     if getattr(request.state, "user_id", None):
         return request.state.user_id
     external_sub: Optional[str] = getattr(request.state, "external_sub", None)
     if not external_sub:
         raise HTTPException(status_code=401, detail="missing token")
-    settings = get_settings()
-    identity = (
-        db.query(AuthIdentity)
-        .filter(AuthIdentity.provider == settings.auth_provider_name, AuthIdentity.provider_uid == external_sub)
-        .first()
-    )
-    if identity:
-        request.state.user_id = str(identity.user_id)
+    cached_user_id = get_cached_user_id(_PROVIDER, external_sub)
+    if cached_user_id:
+        request.state.user_id = cached_user_id
         return request.state.user_id
-
-    claims = getattr(request.state, "claims", {})
-    user = User(
-        nickname=claims.get("name"),
-        avatar_url=claims.get("picture"),
-    )
-    db.add(user)
-    db.commit()
-    identity = AuthIdentity(
-        user_id=user.id,
-        provider=settings.auth_provider_name,
-        provider_uid=external_sub,
-    )
-    db.add(identity)
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        identity = (
-            db.query(AuthIdentity)
-            .filter(AuthIdentity.provider == settings.auth_provider_name, AuthIdentity.provider_uid == external_sub)
-            .first()
-        )
-        if not identity:
-            raise HTTPException(status_code=500, detail="identity creation failed")
-        request.state.user_id = str(identity.user_id)
+    identity_user_id = _lookup_identity_user_id(db, _PROVIDER, external_sub)
+    if identity_user_id:
+        request.state.user_id = str(identity_user_id)
+        set_cached_user_id(_PROVIDER, external_sub, request.state.user_id)
         return request.state.user_id
 
-    request.state.user_id = str(user.id)
+    claims = getattr(request.state, "claims", {})
+    identity_user_id = _provision_identity_user_id(db, _PROVIDER, external_sub, claims)
+    request.state.user_id = str(identity_user_id)
+    set_cached_user_id(_PROVIDER, external_sub, request.state.user_id)
     return request.state.user_id
 
 
-def require_auth(user_id: str = Depends(get_current_user_id)) -> str:
+def require_auth(user_id: str = Depends(get_current_user_id)) -> uuid.UUID:
     if not user_id:
         raise HTTPException(status_code=401, detail="missing token")
-    return user_id
+    # Parsed once per request; handlers compare and insert the UUID directly.
+    return uuid.UUID(user_id)
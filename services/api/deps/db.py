@@ -9,6 +9,8 @@ SessionLocal = get_session_factory()
 
 
 def get_db() -> Generator[Session, None, None]:
+    # FastAPI caches dependencies per request, so get_current_user_id and the endpoint share this
+    # one session; routes that never touch the database never open one.
     session = SessionLocal()
     try:
         yield session
@@ -0,0 +1,78 @@
+import logging
+import time
+
+import redis
+from fastapi import HTTPException, Request
+
+from shared.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Atomic increment that only sets the TTL when the window's key is created.
+_INCR_WITH_TTL = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
+
+# After a Redis error the limiter fails open without calling Redis for this long.
+_ERROR_BACKOFF_SECONDS = 5
+
+
+def _client_ip(request: Request) -> str:
+    if get_settings().rate_limit_trust_forwarded_for:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            return forwarded_for.split(",", 1)[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """Fixed-window limit of `times` requests per `seconds`, keyed on client IP and route."""
+
+    def __init__(self, times: int, seconds: int) -> None:
+        self.times = times
+        self.seconds = seconds
+        self._script = None
+        self._skip_until = 0.0
+        self._warned_missing_client = False
+
+    async def _incr(self, client, key: str) -> int:
+        # Script objects hash their source on construction; build it once per limiter and run it on
+        # the current lifespan's client, since the first one may belong to a loop that is gone.
+        if self._script is None:
+            self._script = client.register_script(_INCR_WITH_TTL)
+        return await self._script(keys=[key], args=[self.seconds], client=client)
+
+    async def __call__(self, request: Request) -> None:
+        # Async so the check runs on the event loop instead of taking a threadpool slot.
+        if time.monotonic() < self._skip_until:
+            return
+        route = request.scope.get("route")
+        path = route.path if route else request.url.path
+        now = int(time.time())
+        key = f"rate:{_client_ip(request)}:{request.method}:{path}:{now // self.seconds}"
+        client = getattr(request.app.state, "redis", None)
+        if client is None:
+            if not self._warned_missing_client:
+                logger.warning("rate limiter has no redis client; is the app lifespan running?")
+                self._warned_missing_client = True
+            return
+        try:
+            count = await self._incr(client, key)
+        except redis.RedisError:
+            logger.warning("rate limiter unavailable")
+            self._skip_until = time.monotonic() + _ERROR_BACKOFF_SECONDS
+            return
+        headers = {
+            "X-RateLimit-Limit": str(self.times),
+            "X-RateLimit-Remaining": str(max(self.times - count, 0)),
+        }
+        if count > self.times:
+            headers["Retry-After"] = str(self.seconds - now % self.seconds)
+            raise HTTPException(status_code=429, detail="too many requests", headers=headers)
+        # Handlers return their own response object, so api_response() copies these onto it.
+        request.state.rate_limit_headers = headers
@@ -1,25 +1,30 @@
 import logging
-import os
-import secrets
-from datetime import datetime
+import shutil
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any, Optional
 from uuid import UUID
 
-from fastapi import Depends, FastAPI, File, HTTPException, Query, Request, UploadFile
+import anyio
+from fastapi import BackgroundTasks, Depends, FastAPI, File, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
-from sqlalchemy import func
+from sqlalchemy import bindparam, delete, func, lambda_stmt, literal, select
 from sqlalchemy.orm import Session
 
 from services.api.deps.auth import get_current_user_id, require_auth
 from services.api.deps.db import get_db
+from services.api.deps.rate_limit import RateLimiter
 from services.api.middleware.auth import AuthMiddleware
+from shared.cache import get_cached_profile, set_cached_profile
 from shared.celery_app import celery_app
 from shared.config import get_settings
-from shared.logging import configure_logging
+from shared.logging import REQUEST_ID, configure_logging
 from shared.models import Collection, Job, Problem, User
+from shared.redis import create_async_redis
 from shared.schemas import (
     CollectionCreateRequest,
     CollectionUpdateRequest,
@@ -35,15 +40,92 @@ from shared.schemas import (
     UploadPresignRequest,
     WechatExchangeRequest,
 )
-from shared.storage import build_presign_response, ensure_storage_root, get_local_path, get_public_url
+from shared.storage import (
+    build_presign_response,
+    ensure_storage_root,
+    get_local_path,
+    get_public_url,
+    owns_object_key,
+)
 
 
 configure_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Read endpoints select plain rows instead of hydrating Problem instances.
+PROBLEM_COLUMNS = (
+    Problem.id,
+    Problem.status,
+    Problem.original_image_url,
+    Problem.cropped_image_url,
+    Problem.ocr_text,
+    Problem.note,
+    Problem.tags,
+    Problem.order_index,
+    Problem.version,
+)
+
 settings = get_settings()
 
+# Owned-entity lookups run on nearly every mutation; lambda_stmt caches them on the lambda's code
+# location, skipping statement construction and cache-key generation per request.
+_OWNED_COLLECTION_STMT = lambda_stmt(
+    lambda: select(Collection).where(Collection.id == bindparam("id"), Collection.user_id == bindparam("user_id"))
+)
+_OWNS_COLLECTION_STMT = lambda_stmt(
+    lambda: select(literal(True)).where(
+        Collection.id == bindparam("id"), Collection.user_id == bindparam("user_id")
+    )
+)
+_OWNED_PROBLEM_STMT = lambda_stmt(
+    lambda: select(Problem).where(Problem.id == bindparam("id"), Problem.user_id == bindparam("user_id"))
+)
+_JOB_BY_IDEMPOTENCY_KEY_STMT = lambda_stmt(
+    lambda: select(Job).where(
+        Job.user_id == bindparam("user_id"),
+        Job.type == bindparam("type"),
+        Job.idempotency_key == bindparam("idempotency_key"),
+    )
+)
+
+
+def _get_owned_collection(db: Session, collection_id: str, user_id: UUID) -> Optional[Collection]:
+    return db.execute(_OWNED_COLLECTION_STMT, {"id": collection_id, "user_id": user_id}).scalar_one_or_none()
+
+
+def _owns_collection(db: Session, collection_id: str, user_id: UUID) -> bool:
+    return db.execute(_OWNS_COLLECTION_STMT, {"id": collection_id, "user_id": user_id}).scalar() is not None
+
+
+def _get_owned_problem(db: Session, problem_id: str, user_id: UUID) -> Optional[Problem]:
+    return db.execute(_OWNED_PROBLEM_STMT, {"id": problem_id, "user_id": user_id}).scalar_one_or_none()
+
+
+def _get_job_by_idempotency_key(db: Session, user_id: UUID, job_type: str, idempotency_key: str) -> Optional[Job]:
+    return db.execute(
+        _JOB_BY_IDEMPOTENCY_KEY_STMT,
+        {"user_id": user_id, "type": job_type, "idempotency_key": idempotency_key},
+    ).scalar_one_or_none()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync endpoints and dependencies run on AnyIO worker threads, each holding one pooled DB connection.
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.api_threadpool_size or settings.db_pool_size + settings.db_max_overflow
+    app.state.redis = create_async_redis(timeout_seconds=settings.rate_limit_redis_timeout_seconds)
+    try:
+        yield
+    finally:
+        await app.state.redis.aclose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+read_rate_limit = Depends(RateLimiter(times=settings.rate_limit_read_per_minute, seconds=60))
+write_rate_limit = Depends(RateLimiter(times=settings.rate_limit_write_per_minute, seconds=60))
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -57,23 +139,17 @@ ensure_storage_root()
 app.mount("/media", StaticFiles(directory=settings.storage_root), name="media")
 
 
-@app.middleware("http")
-async def request_id_middleware(request: Request, call_next):
-    request_id = request.headers.get("x-request-id") or secrets.token_hex(8)
-    request.state.request_id = request_id
-    response = await call_next(request)
-    response.headers["x-request-id"] = request_id
-    return response
-
-
-def api_response(request: Request, data: Any = None, code: int = 0, message: str = "ok") -> JSONResponse:
-    payload = {"code": code, "message": message, "data": data, "request_id": request.state.request_id}
-    return JSONResponse(payload)
+def api_response(request: Request, data: Any = None, code: int = 0, message: str = "ok") -> ORJSONResponse:
+    payload = {"code": code, "message": message, "data": data, "request_id": REQUEST_ID.get()}
+    return ORJSONResponse(payload, headers=getattr(request.state, "rate_limit_headers", None))
 
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return api_response(request, data=None, code=exc.status_code, message=exc.detail)
+    response = api_response(request, data=None, code=exc.status_code, message=exc.detail)
+    if exc.headers:
+        response.headers.update(exc.headers)
+    return response
 
 
 @app.exception_handler(RequestValidationError)
@@ -110,21 +186,19 @@ def logout(request: Request, body: LogoutRequest):
     return deprecated_auth_response(request)
 
 
-@app.get("/api/v1/me")
-def me(request: Request, user_id: str = Depends(require_auth), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == UUID(user_id)).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="not found")
+@app.get("/api/v1/me", dependencies=[read_rate_limit])
+def me(request: Request, user_id: UUID = Depends(require_auth), db: Session = Depends(get_db)):
+    profile = get_cached_profile(str(user_id))
+    if profile is None:
+        row = db.execute(
+            select(User.nickname, User.avatar_url).where(User.id == user_id)
+        ).one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="not found")
+        profile = {"id": str(user_id), "nickname": row.nickname, "avatar_url": row.avatar_url}
+        set_cached_profile(profile["id"], profile)
     claims = getattr(request.state, "claims", {})
-    return api_response(
-        request,
-        data={
-            "id": str(user.id),
-            "nickname": user.nickname,
-            "avatar_url": user.avatar_url,
-            "email": claims.get("email"),
-        },
-    )
+    return api_response(request, data={**profile, "email": claims.get("email")})
 
 
 @app.get("/api/v1/auth/wechat/web/authorize")
@@ -147,44 +221,39 @@ def create_collection(
     request: Request,
     body: CollectionCreateRequest,
     db: Session = Depends(get_db),
-    user_id: str = Depends(require_auth),
+    user_id: UUID = Depends(require_auth),
 ):
-    collection = Collection(user_id=UUID(user_id), name=body.name)
+    collection = Collection(user_id=user_id, name=body.name)
     db.add(collection)
     db.commit()
     return api_response(request, data={"id": str(collection.id), "name": collection.name})
 
 
-@app.get("/api/v1/collections")
-def list_collections(request: Request, db: Session = Depends(get_db), user_id: str = Depends(require_auth)):
-    collections = db.query(Collection).filter(Collection.user_id == UUID(user_id)).all()
-    collection_ids = [c.id for c in collections]
-    counts = (
-        db.query(Problem.collection_id, func.count(Problem.id))
-        .filter(Problem.collection_id.in_(collection_ids))
-        .group_by(Problem.collection_id)
-        .all()
-    )
-    count_map = {str(cid): count for cid, count in counts}
-    data = [
-        {"id": str(c.id), "name": c.name, "problem_count": count_map.get(str(c.id), 0)}
-        for c in collections
-    ]
+@app.get("/api/v1/collections", dependencies=[read_rate_limit])
+def list_collections(request: Request, db: Session = Depends(get_db), user_id: UUID = Depends(require_auth)):
+    # problems.collection_id is the leading column of ix_problems_collection_created_at, which serves the join.
+    rows = db.execute(
+        select(Collection.id, Collection.name, func.count(Problem.id))
+        .outerjoin(Problem, Problem.collection_id == Collection.id)
+        .where(Collection.user_id == user_id)
+        .group_by(Collection.id)
+    ).all()
+    data = [{"id": str(cid), "name": name, "problem_count": count} for cid, name, count in rows]
     return api_response(request, data=data)
 
 
-@app.get("/api/v1/collections/{collection_id}")
+@app.get("/api/v1/collections/{collection_id}", dependencies=[read_rate_limit])
 def get_collection(
     request: Request,
     collection_id: str,
     db: Session = Depends(get_db),
-    user_id: str = Depends(require_auth),
+    user_id: UUID = Depends(require_auth),
 ):
-    collection = (
-        db.query(Collection)
-        .filter(Collection.id == collection_id, Collection.user_id == UUID(user_id))
-        .first()
-    )
+    collection = db.execute(
+        select(Collection.id, Collection.name).where(
+            Collection.id == collection_id, Collection.user_id == user_id
+        )
+    ).one_or_none()
     if not collection:
         raise HTTPException(status_code=404, detail="not found")
     return api_response(request, data={"id": str(collection.id), "name": collection.name})
@@ -196,69 +265,61 @@ def update_collection(
     collection_id: str,
     body: CollectionUpdateRequest,
     db: Session = Depends(get_db),
-    user_id: str = Depends(require_auth),
+    user_id: UUID = Depends(require_auth),
 ):
-    collection = (
-        db.query(Collection)
-        .filter(Collection.id == collection_id, Collection.user_id == UUID(user_id))
-        .first()
-    )
+    collection = _get_owned_collection(db, collection_id, user_id)
     if not collection:
         raise HTTPException(status_code=404, detail="not found")
     if body.name:
         collection.name = body.name
-    collection.updated_at = datetime.utcnow()
-    db.add(collection)
     db.commit()
     return api_response(request, data={"id": str(collection.id), "name": collection.name})
 
 
 @app.delete("/api/v1/collections/{collection_id}")
 def delete_collection(
-    request: Request, collection_id: str, db: Session = Depends(get_db), user_id: str = Depends(require_auth)
+    request: Request, collection_id: str, db: Session = Depends(get_db), user_id: UUID = Depends(require_auth)
 ):
-    collection = (
-        db.query(Collection)
-        .filter(Collection.id == collection_id, Collection.user_id == UUID(user_id))
-        .first()
-    )
-    if not collection:
+    deleted = db.execute(
+        delete(Collection)
+        .where(Collection.id == collection_id, Collection.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not deleted:
         raise HTTPException(status_code=404, detail="not found")
-    db.delete(collection)
     db.commit()
     return api_response(request, data={"deleted": True})
 
 
 @app.post("/api/v1/uploads/presign")
 def upload_presign(
-    request: Request, body: UploadPresignRequest, user_id: str = Depends(require_auth)
+    request: Request, body: UploadPresignRequest, user_id: UUID = Depends(require_auth)
 ):
     data = build_presign_response(user_id, body.filename)
     return api_response(request, data=data)
 
 
-@app.post("/api/v1/uploads/direct")
+@app.post("/api/v1/uploads/direct", dependencies=[write_rate_limit])
 def upload_direct(
     request: Request,
     object_key: str = Query(...),
     file: UploadFile = File(...),
-    user_id: str = Depends(require_auth),
+    user_id: UUID = Depends(require_auth),
 ):
-    if not object_key.startswith(f"user/{user_id}/"):
+    if not owns_object_key(user_id, object_key):
         raise HTTPException(status_code=403, detail="invalid object key")
     local_path = get_local_path(object_key)
-    os_dir = local_path.rsplit("/", 1)[0]
-    os.makedirs(os_dir, exist_ok=True)
+    Path(local_path).parent.mkdir(parents=True, exist_ok=True)
     with open(local_path, "wb") as buffer:
-        buffer.write(file.file.read())
+        shutil.copyfileobj(file.file, buffer, UPLOAD_CHUNK_SIZE)
     return api_response(request, data={"object_key": object_key, "url": get_public_url(object_key)})
 
 
 @app.post("/api/v1/uploads/complete")
 def upload_complete(
-    request: Request, body: UploadCompleteRequest, user_id: str = Depends(require_auth)
+    request: Request, body: UploadCompleteRequest, user_id: UUID = Depends(require_auth)
 ):
-    if not body.object_key.startswith(f"user/{user_id}/"):
+    if not owns_object_key(user_id, body.object_key):
         raise HTTPException(status_code=403, detail="invalid object key")
     return api_response(request, data={"url": get_public_url(body.object_key)})
 
@@ -268,18 +329,13 @@ def create_problem(
     request: Request,
     body: ProblemCreateRequest,
     db: Session = Depends(get_db),
-    user_id: str = Depends(require_auth),
+    user_id: UUID = Depends(require_auth),
 ):
-    collection = (
-        db.query(Collection)
-        .filter(Collection.id == body.collection_id, Collection.user_id == UUID(user_id))
-        .first()
-    )
-    if not collection:
+    if not _owns_collection(db, body.collection_id, user_id):
         raise HTTPException(status_code=404, detail="collection not found")
     problem = Problem(
-        user_id=UUID(user_id),
-        collection_id=collection.id,
+        user_id=user_id,
+        collection_id=UUID(body.collection_id),
         status="DRAFT",
         original_image_url=body.original_image_url,
         cropped_image_url=body.cropped_image_url,
@@ -290,58 +346,39 @@ def create_problem(
     return api_response(request, data={"id": str(problem.id), "status": problem.status})
 
 
-@app.get("/api/v1/collections/{collection_id}/problems")
+@app.get("/api/v1/collections/{collection_id}/problems", dependencies=[read_rate_limit])
 def list_problems(
     request: Request,
     collection_id: str,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    updated_after: Optional[str] = None,
+    updated_after: Optional[datetime] = None,
     db: Session = Depends(get_db),
-    user_id: str = Depends(require_auth),
+    user_id: UUID = Depends(require_auth),
 ):
-    query = db.query(Problem).filter(
-        Problem.collection_id == collection_id, Problem.user_id == UUID(user_id)
+    query = select(*PROBLEM_COLUMNS).where(
+        Problem.collection_id == collection_id, Problem.user_id == user_id
     )
     if updated_after:
-        query = query.filter(Problem.updated_at > datetime.fromisoformat(updated_after))
-    problems = query.order_by(Problem.updated_at.desc()).offset(offset).limit(limit).all()
-    data = [
-        {
-            "id": str(p.id),
-            "status": p.status,
-            "original_image_url": p.original_image_url,
-            "cropped_image_url": p.cropped_image_url,
-            "ocr_text": p.ocr_text,
-            "note": p.note,
-            "tags": p.tags,
-            "order_index": p.order_index,
-            "version": p.version,
-        }
-        for p in problems
-    ]
+        if updated_after.tzinfo is not None:
+            # Stored timestamps are naive UTC.
+            updated_after = updated_after.astimezone(timezone.utc).replace(tzinfo=None)
+        query = query.where(Problem.updated_at > updated_after)
+    rows = db.execute(query.order_by(Problem.updated_at.desc()).offset(offset).limit(limit)).mappings().all()
+    data = [{**row, "id": str(row["id"])} for row in rows]
     return api_response(request, data=data)
 
 
-@app.get("/api/v1/problems/{problem_id}")
+@app.get("/api/v1/problems/{problem_id}", dependencies=[read_rate_limit])
 def get_problem(
-    request: Request, problem_id: str, db: Session = Depends(get_db), user_id: str = Depends(require_auth)
+    request: Request, problem_id: str, db: Session = Depends(get_db), user_id: UUID = Depends(require_auth)
 ):
-    problem = db.query(Problem).filter(Problem.id == problem_id, Problem.user_id == UUID(user_id)).first()
-    if not problem:
+    row = db.execute(
+        select(*PROBLEM_COLUMNS).where(Problem.id == problem_id, Problem.user_id == user_id)
+    ).mappings().one_or_none()
+    if not row:
         raise HTTPException(status_code=404, detail="not found")
-    data = {
-        "id": str(problem.id),
-        "status": problem.status,
-        "original_image_url": problem.original_image_url,
-        "cropped_image_url": problem.cropped_image_url,
-        "ocr_text": problem.ocr_text,
-        "note": problem.note,
-        "tags": problem.tags,
-        "order_index": problem.order_index,
-        "version": problem.version,
-    }
-    return api_response(request, data=data)
+    return api_response(request, data={**row, "id": str(row["id"])})
 
 
 @app.patch("/api/v1/problems/{problem_id}")
@@ -350,22 +387,17 @@ def update_problem(
     problem_id: str,
     body: ProblemUpdateRequest,
     db: Session = Depends(get_db),
-    user_id: str = Depends(require_auth),
+    user_id: UUID = Depends(require_auth),
 ):
-    problem = db.query(Problem).filter(Problem.id == problem_id, Problem.user_id == UUID(user_id)).first()
+    problem = _get_owned_problem(db, problem_id, user_id)
     if not problem:
         raise HTTPException(status_code=404, detail="not found")
     if problem.version != body.version:
         raise HTTPException(status_code=409, detail="version mismatch")
     if body.collection_id:
-        collection = (
-            db.query(Collection)
-            .filter(Collection.id == body.collection_id, Collection.user_id == UUID(user_id))
-            .first()
-        )
-        if not collection:
+        if not _owns_collection(db, body.collection_id, user_id):
             raise HTTPException(status_code=404, detail="collection not found")
-        problem.collection_id = collection.id
+        problem.collection_id = UUID(body.collection_id)
     if body.ocr_text is not None:
         problem.ocr_text = body.ocr_text
     if body.note is not None:
@@ -375,60 +407,56 @@ def update_problem(
     if body.order_index is not None:
         problem.order_index = body.order_index
     problem.version += 1
-    problem.updated_at = datetime.utcnow()
-    db.add(problem)
     db.commit()
     return api_response(request, data={"id": str(problem.id), "version": problem.version})
 
 
 @app.delete("/api/v1/problems/{problem_id}")
 def delete_problem(
-    request: Request, problem_id: str, db: Session = Depends(get_db), user_id: str = Depends(require_auth)
+    request: Request, problem_id: str, db: Session = Depends(get_db), user_id: UUID = Depends(require_auth)
 ):
-    problem = db.query(Problem).filter(Problem.id == problem_id, Problem.user_id == UUID(user_id)).first()
-    if not problem:
+    deleted = db.execute(
+        delete(Problem)
+        .where(Problem.id == problem_id, Problem.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not deleted:
         raise HTTPException(status_code=404, detail="not found")
-    db.delete(problem)
     db.commit()
     return api_response(request, data={"deleted": True})
 
 
-@app.get("/api/v1/jobs/{job_id}")
+@app.get("/api/v1/jobs/{job_id}", dependencies=[read_rate_limit])
 def get_job(
-    request: Request, job_id: str, db: Session = Depends(get_db), user_id: str = Depends(require_auth)
+    request: Request, job_id: str, db: Session = Depends(get_db), user_id: UUID = Depends(require_auth)
 ):
-    job = db.query(Job).filter(Job.id == job_id, Job.user_id == UUID(user_id)).first()
-    if not job:
+    row = db.execute(
+        select(Job.status, Job.result, Job.error_message).where(Job.id == job_id, Job.user_id == user_id)
+    ).mappings().one_or_none()
+    if not row:
         raise HTTPException(status_code=404, detail="not found")
-    data = {"status": job.status, "result": job.result, "error_message": job.error_message}
+    data = dict(row)
     return api_response(request, data=data)
 
 
-@app.post("/api/v1/problems/{problem_id}/ocr")
+@app.post("/api/v1/problems/{problem_id}/ocr", dependencies=[write_rate_limit])
 def trigger_ocr(
     request: Request,
     problem_id: str,
     body: OcrRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    user_id: str = Depends(require_auth),
+    user_id: UUID = Depends(require_auth),
 ):
-    problem = db.query(Problem).filter(Problem.id == problem_id, Problem.user_id == UUID(user_id)).first()
+    problem = _get_owned_problem(db, problem_id, user_id)
     if not problem:
         raise HTTPException(status_code=404, detail="not found")
     job = None
     if body.idempotency_key:
-        job = (
-            db.query(Job)
-            .filter(
-                Job.user_id == UUID(user_id),
-                Job.type == "OCR",
-                Job.idempotency_key == body.idempotency_key,
-            )
-            .first()
-        )
+        job = _get_job_by_idempotency_key(db, user_id, "OCR", body.idempotency_key)
     if not job:
         job = Job(
-            user_id=UUID(user_id),
+            user_id=user_id,
             type="OCR",
             status="PENDING",
             target_id=problem.id,
@@ -436,45 +464,35 @@ def trigger_ocr(
         )
         db.add(job)
         problem.status = "OCR_PENDING"
-        problem.updated_at = datetime.utcnow()
         db.commit()
         image_url = body.image_url or problem.original_image_url
-        celery_app.send_task(
+        # Publish after the response is sent; the job row already records the request.
+        background_tasks.add_task(
+            celery_app.send_task,
             "services.worker.tasks.ocr_task",
             args=[str(problem.id), str(job.id), image_url],
         )
     return api_response(request, data={"job_id": str(job.id)})
 
 
-@app.post("/api/v1/collections/{collection_id}/export_pdf")
+@app.post("/api/v1/collections/{collection_id}/export_pdf", dependencies=[write_rate_limit])
 def export_pdf(
     request: Request,
     collection_id: str,
     body: ExportPdfRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    user_id: str = Depends(require_auth),
+    user_id: UUID = Depends(require_auth),
 ):
-    collection = (
-        db.query(Collection)
-        .filter(Collection.id == collection_id, Collection.user_id == UUID(user_id))
-        .first()
-    )
+    collection = _get_owned_collection(db, collection_id, user_id)
     if not collection:
         raise HTTPException(status_code=404, detail="not found")
     job = None
     if body.idempotency_key:
-        job = (
-            db.query(Job)
-            .filter(
-                Job.user_id == UUID(user_id),
-                Job.type == "PDF_EXPORT",
-                Job.idempotency_key == body.idempotency_key,
-            )
-            .first()
-        )
+        job = _get_job_by_idempotency_key(db, user_id, "PDF_EXPORT", body.idempotency_key)
     if not job:
         job = Job(
-            user_id=UUID(user_id),
+            user_id=user_id,
             type="PDF_EXPORT",
             status="PENDING",
             target_id=collection.id,
@@ -482,7 +500,8 @@ def export_pdf(
         )
         db.add(job)
         db.commit()
-        celery_app.send_task(
+        background_tasks.add_task(
+            celery_app.send_task,
             "services.worker.tasks.export_pdf_task",
             args=[str(collection.id), str(job.id), body.options or {}],
         )
@@ -1,47 +1,77 @@
+import os
 from typing import Callable
 
-from fastapi import Request
-from fastapi.responses import JSONResponse
+import orjson
 
 from services.api.security.jwt_verify import TokenVerificationError, verify_bearer_token
 from shared.config import get_settings
+from shared.logging import REQUEST_ID
+
+
+def _unauthorized_body_prefix(message: str) -> bytes:
+    # Everything up to the request id is constant; the id itself is client-supplied and stays escaped.
+    return orjson.dumps({"code": 401, "message": message, "data": None, "request_id": None})[: -len(b"null}")]
+
+
+_INVALID_HEADER_BODY = _unauthorized_body_prefix("invalid authorization header")
+_INVALID_TOKEN_BODY = _unauthorized_body_prefix("invalid token")
+
+
+async def _send_unauthorized(send: Callable, body_prefix: bytes, request_id: str) -> None:
+    body = body_prefix + orjson.dumps(request_id) + b"}"
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
 
 
 class AuthMiddleware:
+    """Pure ASGI middleware: assigns the request id and reads the bearer token straight from scope
+    headers, storing both in scope["state"], which backs request.state."""
+
     def __init__(self, app: Callable):
         self.app = app
-        self.settings = get_settings()
+        settings = get_settings()
+        self.dev_bypass_sub = settings.auth_dev_user_sub if settings.auth_dev_bypass else None
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
-        request = Request(scope, receive=receive)
-        if self.settings.auth_dev_bypass:
-            request.state.external_sub = self.settings.auth_dev_user_sub
-            request.state.claims = {"sub": self.settings.auth_dev_user_sub}
-            await self.app(scope, receive, send)
-            return
-        auth_header = request.headers.get("authorization")
-        request_id = request.headers.get("x-request-id") or ""
-        if auth_header:
-            if not auth_header.lower().startswith("bearer "):
-                response = JSONResponse(
-                    {"code": 401, "message": "invalid authorization header", "data": None, "request_id": request_id},
-                    status_code=401,
-                )
-                await response(scope, receive, send)
+        auth_header = request_id = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+            elif name == b"x-request-id":
+                request_id = value.decode("latin-1")
+        request_id = request_id or os.urandom(16).hex()
+        request_id_header = (b"x-request-id", request_id.encode("latin-1"))
+        REQUEST_ID.set(request_id)
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), request_id_header]
+            await send(message)
+
+        if self.dev_bypass_sub:
+            state["external_sub"] = self.dev_bypass_sub
+            state["claims"] = {"sub": self.dev_bypass_sub}
+        elif auth_header:
+            scheme, token = auth_header[:7], auth_header[7:].strip()
+            if scheme.lower() != "bearer " or not token:
+                await _send_unauthorized(send_with_request_id, _INVALID_HEADER_BODY, request_id)
                 return
-            token = auth_header.split(" ", 1)[1]
             try:
                 claims = verify_bearer_token(token)
             except TokenVerificationError:
-                response = JSONResponse(
-                    {"code": 401, "message": "invalid token", "data": None, "request_id": request_id},
-                    status_code=401,
-                )
-                await response(scope, receive, send)
+                await _send_unauthorized(send_with_request_id, _INVALID_TOKEN_BODY, request_id)
                 return
-            request.state.external_sub = claims.get("sub")
-            request.state.claims = claims
-        await self.app(scope, receive, send)
+            state["external_sub"] = claims.get("sub")
+            state["claims"] = claims
+        await self.app(scope, receive, send_with_request_id)
@@ -1,7 +1,9 @@
+import json
 import time
 from typing import Any, Dict
 
 import httpx
+import jwt
 
 from shared.config import get_settings
 
@@ -11,14 +13,29 @@ class JWKSClient:
         self.jwks_url = jwks_url
         self.cache_ttl = cache_ttl
         self._keys: Dict[str, Dict[str, Any]] = {}
+        self._public_keys: Dict[str, Any] = {}
         self._expires_at = 0.0
+        self._etag: str | None = None
+        # Reused so refreshes keep the connection (and its TLS session) alive.
+        self._http = httpx.Client(timeout=10)
 
     def _refresh(self) -> None:
-        response = httpx.get(self.jwks_url, timeout=10)
+        headers = {"If-None-Match": self._etag} if self._etag else {}
+        response = self._http.get(self.jwks_url, headers=headers)
+        if response.status_code == 304:
+            self._expires_at = time.time() + self.cache_ttl
+            return
         response.raise_for_status()
+        self._etag = response.headers.get("etag")
         payload = response.json()
         keys = {key["kid"]: key for key in payload.get("keys", []) if "kid" in key}
         self._keys = keys
+        # Parse RSA keys once per refresh rather than on every token verification.
+        self._public_keys = {
+            kid: jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
+            for kid, key in keys.items()
+            if key.get("kty") == "RSA"
+        }
         self._expires_at = time.time() + self.cache_ttl
 
     def get_signing_key(self, kid: str) -> Dict[str, Any]:
@@ -32,6 +49,13 @@ class JWKSClient:
             raise KeyError(f"signing key not found for kid={kid}")
         return key
 
+    def get_public_key(self, kid: str) -> Any:
+        self.get_signing_key(kid)
+        public_key = self._public_keys.get(kid)
+        if public_key is None:
+            raise KeyError(f"no RSA public key for kid={kid}")
+        return public_key
+
 
 _jwks_client: JWKSClient | None = None
 
@@ -1,4 +1,8 @@
-import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
 
 import jwt
 
@@ -10,15 +14,39 @@ class TokenVerificationError(Exception):
     pass
 
 
+# Clients reuse an access token across many requests; remember verified claims briefly (keyed by
+# the token's digest to bound memory) so repeat requests skip the RSA signature check.
+_VERIFIED_MAX_ENTRIES = 8192
+_verified_tokens: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+_verified_lock = threading.Lock()
+
+
 def verify_bearer_token(token: str) -> dict:
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    now = time.time()
+    entry = _verified_tokens.get(digest)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    claims = _verify_signature(token)
+    cached_until = now + get_settings().verified_token_cache_ttl_seconds
+    if "exp" in claims:
+        cached_until = min(cached_until, claims["exp"])
+    with _verified_lock:
+        _verified_tokens[digest] = (cached_until, claims)
+        _verified_tokens.move_to_end(digest)
+        if len(_verified_tokens) > _VERIFIED_MAX_ENTRIES:
+            _verified_tokens.popitem(last=False)
+    return claims
+
+
+def _verify_signature(token: str) -> dict:
     settings = get_settings()
     try:
         header = jwt.get_unverified_header(token)
         kid = header.get("kid")
         if not kid:
             raise TokenVerificationError("missing kid")
-        jwk = get_jwks_client().get_signing_key(kid)
-        public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(jwk))
+        public_key = get_jwks_client().get_public_key(kid)
         options = {"verify_aud": bool(settings.better_auth_audience)}
         claims = jwt.decode(
             token,
@@ -1,11 +1,11 @@
 import logging
 import os
-from datetime import datetime
 from typing import Any, Dict
 
 import requests
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from shared.celery_app import celery_app
@@ -16,21 +16,21 @@ from shared.storage import ensure_storage_root, get_local_path, get_public_url
 
 
 logger = logging.getLogger(__name__)
+IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+EXPORT_FETCH_BATCH_SIZE = 500
+
 settings = get_settings()
 SessionLocal = get_session_factory()
 ensure_storage_root()
 
 
 def _update_job(session: Session, job_id: str, status: str, result: Dict[str, Any] | None = None, error: str | None = None):
-    job = session.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        return
-    job.status = status
-    job.result = result
-    job.error_message = error
-    job.updated_at = datetime.utcnow()
-    session.add(job)
-    session.commit()
+    # A single UPDATE; callers commit so it can share a transaction with their own writes.
+    session.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status=status, result=result, error_message=error)
+    )
 
 
 @celery_app.task(name="services.worker.tasks.ocr_task")
@@ -38,35 +38,33 @@ def ocr_task(problem_id: str, job_id: str, image_url: str):
     session = SessionLocal()
     try:
         _update_job(session, job_id, "RUNNING")
-        problem = session.query(Problem).filter(Problem.id == problem_id).first()
-        if not problem:
+        session.commit()
+        if session.execute(select(Problem.id).where(Problem.id == problem_id)).first() is None:
             raise ValueError("problem not found")
+        # The mock OCR only needs the image size, so neither source is buffered in memory.
         if image_url.startswith(settings.public_base_url):
             relative_key = image_url.replace(f"{settings.public_base_url}/", "")
-            image_path = get_local_path(relative_key)
-            with open(image_path, "rb") as file:
-                content = file.read()
+            image_size = os.path.getsize(get_local_path(relative_key))
         else:
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            content = response.content
+            image_size = 0
+            with requests.get(image_url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(IMAGE_DOWNLOAD_CHUNK_SIZE):
+                    image_size += len(chunk)
         ocr_text = "mock ocr text"
-        ocr_raw = {"length": len(content), "source": image_url}
-        problem.ocr_text = ocr_text
-        problem.ocr_raw = ocr_raw
-        problem.status = "OCR_DONE"
-        problem.updated_at = datetime.utcnow()
-        session.add(problem)
-        session.commit()
+        ocr_raw = {"length": image_size, "source": image_url}
+        session.execute(
+            update(Problem)
+            .where(Problem.id == problem_id)
+            .values(ocr_text=ocr_text, ocr_raw=ocr_raw, status="OCR_DONE")
+        )
         _update_job(session, job_id, "SUCCESS", result={"problem_id": problem_id, "ocr_text": ocr_text})
+        session.commit()
     except Exception as exc:  # noqa: BLE001
-        problem = session.query(Problem).filter(Problem.id == problem_id).first()
-        if problem:
-            problem.status = "OCR_FAILED"
-            problem.updated_at = datetime.utcnow()
-            session.add(problem)
-            session.commit()
+        session.rollback()
+        session.execute(update(Problem).where(Problem.id == problem_id).values(status="OCR_FAILED"))
         _update_job(session, job_id, "FAILED", error=str(exc))
+        session.commit()
         logger.exception("ocr failed")
     finally:
         session.close()
@@ -77,29 +75,39 @@ def export_pdf_task(collection_id: str, job_id: str, options: Dict[str, Any]):
     session = SessionLocal()
     try:
         _update_job(session, job_id, "RUNNING")
+        session.commit()
         collection = session.query(Collection).filter(Collection.id == collection_id).first()
         if not collection:
             raise ValueError("collection not found")
-        problems = (
-            session.query(Problem)
-            .filter(Problem.collection_id == collection.id)
+        # Stream plain rows through a server-side cursor so large collections are never fully resident.
+        problems = session.execute(
+            select(Problem.id, Problem.ocr_text)
+            .where(Problem.collection_id == collection.id)
             .order_by(Problem.order_index.asc(), Problem.created_at.asc())
-            .all()
+            .execution_options(yield_per=EXPORT_FETCH_BATCH_SIZE)
         )
         object_key = f"user/{collection.user_id}/exports/{collection.id}.pdf"
         local_path = get_local_path(object_key)
         os.makedirs(os.path.dirname(local_path), exist_ok=True)
         pdf = canvas.Canvas(local_path, pagesize=letter)
         for problem in problems:
-            pdf.drawString(72, 720, f"Problem {problem.id}")
+            # One text object per page emits a single BT/ET block instead of one per line.
+            text = pdf.beginText(72, 720)
+            text.setLeading(20)
+            text.textLine(f"Problem {problem.id}")
             if problem.ocr_text:
-                pdf.drawString(72, 700, problem.ocr_text[:200])
+                text.textLine(problem.ocr_text[:200])
+            pdf.drawText(text)
             pdf.showPage()
         pdf.save()
         pdf_url = get_public_url(object_key)
         _update_job(session, job_id, "SUCCESS", result={"pdf_url": pdf_url, "collection_id": collection_id})
+        session.commit()
     except Exception as exc:  # noqa: BLE001
+        session.rollback()
         _update_job(session, job_id, "FAILED", error=str(exc))
+        session.commit()
         logger.exception("pdf export failed")
     finally:
         session.close()
+
@@ -1,12 +1,14 @@
 import hashlib
 import secrets
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 from typing import Optional
 
 import jwt
 from sqlalchemy.orm import Session
 
 from shared.config import get_settings
+from shared.db import utcnow
 from shared.models import RefreshToken, User
 
 
@@ -20,12 +22,12 @@ def _hash_value(value: str) -> str:
 
 def create_access_token(user_id: str) -> str:
     settings = get_settings()
-    now = datetime.utcnow()
+    now = int(time.time())
     payload = {
         "sub": user_id,
         "type": "access",
-        "iat": int(now.timestamp()),
-        "exp": int((now + timedelta(seconds=settings.access_token_expire_seconds)).timestamp()),
+        "iat": now,
+        "exp": now + settings.access_token_expire_seconds,
     }
     return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
@@ -34,7 +36,7 @@ def create_refresh_token(session: Session, user_id: str) -> str:
     settings = get_settings()
     raw_token = secrets.token_urlsafe(32)
     token_hash = _hash_value(raw_token)
-    expires_at = datetime.utcnow() + timedelta(seconds=settings.refresh_token_expire_seconds)
+    expires_at = utcnow() + timedelta(seconds=settings.refresh_token_expire_seconds)
     refresh = RefreshToken(user_id=user_id, token_hash=token_hash, expires_at=expires_at)
     session.add(refresh)
     session.commit()
@@ -50,10 +52,10 @@ def rotate_refresh_token(session: Session, raw_token: str) -> Optional[tuple[str
     )
     if not refresh:
         return None
-    if refresh.expires_at < datetime.utcnow():
+    now = utcnow()
+    if refresh.expires_at < now:
         return None
-    refresh.revoked_at = datetime.utcnow()
-    session.add(refresh)
+    refresh.revoked_at = now
     session.commit()
     new_token = create_refresh_token(session, str(refresh.user_id))
     return new_token, str(refresh.user_id)
@@ -64,8 +66,7 @@ def revoke_refresh_token(session: Session, raw_token: str) -> bool:
     refresh = session.query(RefreshToken).filter(RefreshToken.token_hash == token_hash).first()
     if not refresh or refresh.revoked_at:
         return False
-    refresh.revoked_at = datetime.utcnow()
-    session.add(refresh)
+    refresh.revoked_at = utcnow()
     session.commit()
     return True
 
@@ -0,0 +1,82 @@
+import io
+from typing import Any, Dict, Iterable, List
+
+import orjson
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from shared.models import Problem
+
+
+# Below this size COPY's fixed setup cost outweighs its per-row savings.
+COPY_THRESHOLD = 1000
+
+# id, created_at and updated_at are omitted so Postgres fills them from server defaults.
+_PROBLEM_COPY_COLUMNS = (
+    "user_id",
+    "collection_id",
+    "status",
+    "original_image_url",
+    "cropped_image_url",
+    "ocr_text",
+    "ocr_raw",
+    "note",
+    "tags",
+    "order_index",
+    "version",
+)
+_PROBLEM_COPY_DEFAULTS = {"status": "DRAFT", "order_index": 0, "version": 1}
+
+
+def _array_literal(values: Iterable[Any]) -> str:
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        else:
+            elements.append('"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(elements) + "}"
+
+
+def _copy_value(column: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if column == "tags":
+        return _array_literal(value)
+    if column == "ocr_raw":
+        return orjson.dumps(value).decode()
+    return value
+
+
+def _copy_field(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_buffer(rows: Iterable[Dict[str, Any]]) -> io.StringIO:
+    buffer = io.StringIO()
+    for row in rows:
+        fields = (
+            _copy_field(_copy_value(column, row.get(column, _PROBLEM_COPY_DEFAULTS.get(column))))
+            for column in _PROBLEM_COPY_COLUMNS
+        )
+        buffer.write("\t".join(fields))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def insert_problems(session: Session, rows: List[Dict[str, Any]]) -> None:
+    if len(rows) < COPY_THRESHOLD:
+        session.execute(insert(Problem), rows)
+        return
+    unsupported = {key for row in rows for key in row} - set(_PROBLEM_COPY_COLUMNS)
+    if unsupported:
+        raise ValueError(f"COPY ingest does not support columns: {', '.join(sorted(unsupported))}")
+    cursor = session.connection().connection.cursor()
+    try:
+        with cursor.copy(f"COPY problems ({', '.join(_PROBLEM_COPY_COLUMNS)}) FROM STDIN") as copy:
+            copy.write(_copy_buffer(rows).getvalue())
+    finally:
+        cursor.close()
@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+
+from shared.config import get_settings
+from shared.redis import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# An identity's user id never changes once provisioned, so a process-local copy needs no
+# invalidation; it only has to be bounded.
+_LOCAL_MAX_ENTRIES = 10000
+_local_user_ids: "OrderedDict[str, str]" = OrderedDict()
+_local_lock = threading.Lock()
+
+# Profiles can change, so they are only kept for a short TTL.
+_PROFILE_MAX_ENTRIES = 10000
+_profiles: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+# After a Redis error the cache goes straight to the database for this long, instead of every
+# request waiting out the socket timeout during an outage.
+_ERROR_BACKOFF_SECONDS = 5
+_redis_skip_until = 0.0
+
+
+def _auth_identity_key(provider: str, provider_uid: str) -> str:
+    return f"auth:{provider}:{provider_uid}"
+
+
+def _remember_locally(key: str, user_id: str) -> None:
+    with _local_lock:
+        _local_user_ids[key] = user_id
+        _local_user_ids.move_to_end(key)
+        if len(_local_user_ids) > _LOCAL_MAX_ENTRIES:
+            _local_user_ids.popitem(last=False)
+
+
+def _redis_available() -> bool:
+    return time.monotonic() >= _redis_skip_until
+
+
+def _back_off_redis(operation: str) -> None:
+    global _redis_skip_until
+    # One warning per backoff window; requests that failed concurrently with the first stay quiet.
+    if _redis_available():
+        logger.warning("auth identity cache %s failed; bypassing redis for %ss", operation, _ERROR_BACKOFF_SECONDS)
+    _redis_skip_until = time.monotonic() + _ERROR_BACKOFF_SECONDS
+
+
+def clear_local_cache() -> None:
+    global _redis_skip_until
+    with _local_lock:
+        _local_user_ids.clear()
+        _profiles.clear()
+        _redis_skip_until = 0.0
+
+
+def get_cached_user_id(provider: str, provider_uid: str) -> Optional[str]:
+    key = _auth_identity_key(provider, provider_uid)
+    user_id = _local_user_ids.get(key)
+    if user_id:
+        return user_id
+    # The cache is an optimisation only: any Redis failure falls back to the database.
+    if not _redis_available():
+        return None
+    try:
+        user_id = get_redis().get(key)
+    except redis.RedisError:
+        _back_off_redis("read")
+        return None
+    if user_id:
+        _remember_locally(key, user_id)
+    return user_id
+
+
+def set_cached_user_id(provider: str, provider_uid: str, user_id: str) -> None:
+    settings = get_settings()
+    key = _auth_identity_key(provider, provider_uid)
+    _remember_locally(key, user_id)
+    if not _redis_available():
+        return
+    try:
+        get_redis().setex(key, settings.auth_identity_cache_ttl_seconds, user_id)
+    except redis.RedisError:
+        _back_off_redis("write")
+
+
+def get_cached_profile(user_id: str) -> Optional[Dict[str, Any]]:
+    entry = _profiles.get(user_id)
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    return entry[1]
+
+
+def set_cached_profile(user_id: str, profile: Dict[str, Any]) -> None:
+    expires_at = time.monotonic() + get_settings().user_profile_cache_ttl_seconds
+    with _local_lock:
+        _profiles[user_id] = (expires_at, profile)
+        _profiles.move_to_end(user_id)
+        if len(_profiles) > _PROFILE_MAX_ENTRIES:
+            _profiles.popitem(last=False)
@@ -5,11 +5,9 @@ from shared.config import get_settings
 
 settings = get_settings()
 
-celery_app = Celery(
-    "learnhub",
-    broker=settings.redis_url,
-    backend=settings.redis_url,
-)
+# Task outcomes are recorded on the jobs table, so no result backend is configured.
+celery_app = Celery("learnhub", broker=settings.redis_url)
+celery_app.conf.task_ignore_result = True
 
 celery_app.conf.task_routes = {
     "services.worker.tasks.ocr_task": {"queue": "ocr"},
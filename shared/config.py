@@ -4,8 +4,20 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     env: str = "dev"
-    database_url: str = "postgresql+psycopg2://postgres:postgres@db:5432/learnhub"
+    database_url: str = "postgresql+psycopg://postgres:postgres@db:5432/learnhub"
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_query_cache_size: int = 5000
+    # psycopg prepares a statement server-side after this many executions; None disables it, which
+    # PgBouncer transaction pooling requires unless max_prepared_statements is configured there.
+    db_prepare_threshold: int | None = None
+    api_threadpool_size: int | None = None
     redis_url: str = "redis://redis:6379/0"
+    redis_socket_timeout_seconds: float = 1.0
+    redis_max_connections: int = 50
     jwt_secret: str = "change-me"
     jwt_algorithm: str = "HS256"
     access_token_expire_seconds: int = 3600
@@ -21,9 +33,16 @@ class Settings(BaseSettings):
     better_auth_issuer: str = "http://localhost:3000"
     better_auth_audience: str | None = None
     better_auth_jwks_cache_ttl_seconds: int = 21600
+    verified_token_cache_ttl_seconds: int = 60
     auth_dev_bypass: bool = False
     auth_dev_user_sub: str = "dev-user"
     auth_provider_name: str = "better_auth"
+    auth_identity_cache_ttl_seconds: int = 3600
+    user_profile_cache_ttl_seconds: int = 30
+    rate_limit_read_per_minute: int = 100
+    rate_limit_write_per_minute: int = 10
+    rate_limit_trust_forwarded_for: bool = False
+    rate_limit_redis_timeout_seconds: float = 0.1
     storage_root: str = "/data/storage"
     public_base_url: str = "http://localhost:8000/media"
 
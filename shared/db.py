@@ -1,4 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
@@ -9,15 +11,27 @@ class Base(DeclarativeBase):
     pass
 
 
+@lru_cache
 def get_engine():
     settings = get_settings()
-    return create_engine(settings.database_url, pool_pre_ping=True)
-
-
+    return create_engine(
+        settings.database_url,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        query_cache_size=settings.db_query_cache_size,
+        connect_args={"prepare_threshold": settings.db_prepare_threshold},
+    )
+
+
+@lru_cache
 def get_session_factory():
     engine = get_engine()
     return sessionmaker(bind=engine, expire_on_commit=False)
 
 
 def utcnow() -> datetime:
-    return datetime.utcnow()
+    # Naive UTC, matching the DateTime columns; avoids the deprecated datetime.utcnow().
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -1,8 +1,25 @@
-import json
+import atexit
 import logging
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from contextvars import ContextVar
 from typing import Any, Dict
 
+import orjson
+
+
+REQUEST_ID: ContextVar[str] = ContextVar("request_id", default="")
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = REQUEST_ID.get()
+        if request_id:
+            record.request_id = request_id
+        return True
+
 
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
@@ -13,13 +30,74 @@ class JsonFormatter(logging.Formatter):
         }
         if hasattr(record, "request_id"):
             payload["request_id"] = record.request_id
-        return json.dumps(payload)
+        return orjson.dumps(payload).decode("utf-8")
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """StreamHandler that does not flush after every record.
+
+    INFO lines are flushed by a timer at most `flush_interval` seconds after the first unflushed
+    record, so bursts share one write syscall; WARNING and above are flushed immediately.
+    logging.shutdown() flushes whatever is left at exit.
+    """
+
+    def __init__(self, stream=None, flush_interval: float = 0.5) -> None:
+        super().__init__(stream)
+        self.flush_interval = flush_interval
+        self._flush_timer: threading.Timer | None = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:  # noqa: BLE001
+            self.handleError(record)
+            return
+        if record.levelno >= logging.WARNING:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        with self.lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        super().flush()
+
+
+_listener: QueueListener | None = None
 
 
 def configure_logging() -> None:
-    handler = logging.StreamHandler(sys.stdout)
+    """Route records through a queue so JSON formatting and stdout writes run on a listener thread.
+
+    The request id filter stays on the QueueHandler, because REQUEST_ID is only set on the
+    calling thread.
+    """
+    global _listener
+    stop_logging()
+    handler = BufferedStreamHandler(sys.stdout)
     handler.setFormatter(JsonFormatter())
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(RequestIdFilter())
+    _listener = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    _listener.start()
     root = logging.getLogger()
     root.handlers.clear()
-    root.addHandler(handler)
+    root.addHandler(queue_handler)
     root.setLevel(logging.INFO)
+
+
+def stop_logging() -> None:
+    """Drain queued records; registered with atexit so it runs before logging.shutdown()."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -1,49 +1,103 @@
-import uuid
-from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import relationship
 
-from shared.db import Base, utcnow
+from shared.db import Base
+
+
+UTC_NOW = text("timezone('utc', now())")
+RANDOM_UUID = text("gen_random_uuid()")
+# Time-ordered ids keep inserts on the right edge of the primary key index for high-churn tables.
+TIME_ORDERED_UUID = text("uuid_generate_v7()")
+
+# Mirrors migration 0006 so metadata.create_all() produces the same schema.
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL(
+        """
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+            SELECT encode(
+                set_bit(
+                    set_bit(
+                        overlay(
+                            uuid_send(gen_random_uuid())
+                            PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                            FROM 1 FOR 6
+                        ),
+                        52, 1
+                    ),
+                    53, 1
+                ),
+                'hex'
+            )::uuid
+        $$ LANGUAGE sql VOLATILE
+        """
+    ).execute_if(dialect="postgresql"),
+)
 
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=RANDOM_UUID)
     nickname = Column(String, nullable=True)
     avatar_url = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=utcnow, nullable=False)
-    updated_at = Column(DateTime, default=utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
 
-    identities = relationship("AuthIdentity", back_populates="user")
+    # Load with selectinload(User.identities); implicit per-row lazy loads would be an N+1.
+    identities = relationship("AuthIdentity", back_populates="user", lazy="raise_on_sql")
 
 
 class AuthIdentity(Base):
     __tablename__ = "auth_identities"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=RANDOM_UUID)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     provider = Column(String, nullable=False)
     provider_uid = Column(String, nullable=False)
     union_id = Column(String, nullable=True)
-    created_at = Column(DateTime, default=utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
 
     user = relationship("User", back_populates="identities")
 
-    __table_args__ = (UniqueConstraint("provider", "provider_uid", name="uq_auth_identity_provider_uid"),)
+    __table_args__ = (
+        Index(
+            "uq_auth_identity_provider_uid",
+            "provider",
+            "provider_uid",
+            unique=True,
+            postgresql_include=["user_id"],
+        ),
+        Index("ix_auth_identities_user_id", "user_id"),
+    )
 
 
 class SmsOtp(Base):
     __tablename__ = "sms_otps"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=TIME_ORDERED_UUID)
     phone = Column(String, nullable=False)
     code_hash = Column(String, nullable=False)
     purpose = Column(String, default="login", nullable=False)
     expires_at = Column(DateTime, nullable=False)
     consumed_at = Column(DateTime, nullable=True)
     ip = Column(String, nullable=True)
-    created_at = Column(DateTime, default=utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
 
     __table_args__ = (Index("ix_sms_otps_phone_created_at", "phone", "created_at"),)
 
@@ -51,12 +105,12 @@ class SmsOtp(Base):
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=TIME_ORDERED_UUID)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     token_hash = Column(String, nullable=False)
     expires_at = Column(DateTime, nullable=False)
     revoked_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
 
     __table_args__ = (Index("ix_refresh_tokens_user_id", "user_id"),)
 
@@ -64,11 +118,11 @@ class RefreshToken(Base):
 class Collection(Base):
     __tablename__ = "collections"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=RANDOM_UUID)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     name = Column(String, nullable=False)
-    created_at = Column(DateTime, default=utcnow, nullable=False)
-    updated_at = Column(DateTime, default=utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
 
     __table_args__ = (UniqueConstraint("user_id", "name", name="uq_collections_user_name"),)
 
@@ -76,42 +130,53 @@ class Collection(Base):
 class Problem(Base):
     __tablename__ = "problems"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=TIME_ORDERED_UUID)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     collection_id = Column(UUID(as_uuid=True), ForeignKey("collections.id"), nullable=False)
-    status = Column(String, nullable=False, default="DRAFT")
+    status = Column(String, nullable=False, default="DRAFT", server_default="DRAFT")
     original_image_url = Column(Text, nullable=False)
     cropped_image_url = Column(Text, nullable=True)
     ocr_text = Column(Text, nullable=True)
-    ocr_raw = Column(JSON, nullable=True)
+    ocr_raw = Column(JSONB, nullable=True)
     note = Column(Text, nullable=True)
-    tags = Column(JSON, nullable=True)
-    order_index = Column(Integer, default=0, nullable=False)
-    version = Column(Integer, default=1, nullable=False)
-    created_at = Column(DateTime, default=utcnow, nullable=False)
-    updated_at = Column(DateTime, default=utcnow, nullable=False)
+    tags = Column(ARRAY(Text), nullable=True)
+    order_index = Column(Integer, default=0, server_default="0", nullable=False)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
 
     __table_args__ = (
         Index("ix_problems_collection_created_at", "collection_id", "created_at"),
         Index("ix_problems_user_updated_at", "user_id", "updated_at"),
+        # Serves list_problems' equality filters plus ORDER BY updated_at DESC via a backward scan.
+        Index("ix_problems_collection_user_updated_at", "collection_id", "user_id", "updated_at"),
+        Index("ix_problems_tags", "tags", postgresql_using="gin"),
     )
 
 
 class Job(Base):
     __tablename__ = "jobs"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=TIME_ORDERED_UUID)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     type = Column(String, nullable=False)
     status = Column(String, nullable=False, default="PENDING")
     target_id = Column(UUID(as_uuid=True), nullable=False)
     idempotency_key = Column(String, nullable=True)
-    result = Column(JSON, nullable=True)
+    result = Column(JSONB, nullable=True)
     error_message = Column(Text, nullable=True)
     retry_count = Column(Integer, default=0, nullable=False)
-    created_at = Column(DateTime, default=utcnow, nullable=False)
-    updated_at = Column(DateTime, default=utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW, nullable=False)
 
     __table_args__ = (
-        Index("ix_jobs_user_type_key", "user_id", "type", "idempotency_key"),
+        Index(
+            "uq_jobs_user_type_key",
+            "user_id",
+            "type",
+            "idempotency_key",
+            unique=True,
+            postgresql_where=text("idempotency_key IS NOT NULL"),
+        ),
+        Index("ix_jobs_active", "user_id", "created_at", postgresql_where=text("status IN ('PENDING', 'RUNNING')")),
     )
@@ -1,4 +1,7 @@
+from typing import Optional
+
 import redis
+import redis.asyncio
 
 from shared.config import get_settings
 
@@ -6,9 +9,38 @@ from shared.config import get_settings
 _redis_client = None
 
 
+def _pool_kwargs(settings) -> dict:
+    return {
+        "max_connections": settings.redis_max_connections,
+        "timeout": settings.redis_socket_timeout_seconds,
+        "decode_responses": True,
+        "socket_timeout": settings.redis_socket_timeout_seconds,
+        "socket_connect_timeout": settings.redis_socket_timeout_seconds,
+        "socket_keepalive": True,
+        "health_check_interval": 30,
+    }
+
+
 def get_redis():
     global _redis_client
     if _redis_client is None:
         settings = get_settings()
-        _redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        # Bounded pool: when every connection is busy, callers wait up to the socket timeout and
+        # then get a ConnectionError, which the cache and rate limiter treat as a miss.
+        pool = redis.BlockingConnectionPool.from_url(settings.redis_url, **_pool_kwargs(settings))
+        _redis_client = redis.Redis(connection_pool=pool)
     return _redis_client
+
+
+def create_async_redis(timeout_seconds: Optional[float] = None):
+    """Client for code running on the API event loop; sync callers (threadpool, Celery) use get_redis().
+
+    redis.asyncio connections are bound to the loop they were opened on, so the API lifespan creates
+    one per loop, keeps it on app.state and closes it on shutdown.
+    """
+    settings = get_settings()
+    pool_kwargs = _pool_kwargs(settings)
+    if timeout_seconds is not None:
+        pool_kwargs.update(timeout=timeout_seconds, socket_timeout=timeout_seconds, socket_connect_timeout=timeout_seconds)
+    pool = redis.asyncio.BlockingConnectionPool.from_url(settings.redis_url, **pool_kwargs)
+    return redis.asyncio.Redis(connection_pool=pool)
@@ -1,74 +1,77 @@
-from typing import Any, Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, Any, List, Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class ApiResponse(BaseModel):
-    code: int = 0
-    message: str = "ok"
-    data: Any = None
-    request_id: str
+# Shape checks run in pydantic's validator, before any storage or DB work.
+ObjectKey = Annotated[str, Field(max_length=512, pattern=r"^user/[^/]+/[^/]+$")]
+IdempotencyKey = Annotated[str, Field(min_length=1, max_length=128)]
 
 
-class SmsSendRequest(BaseModel):
+class RequestModel(BaseModel):
+    # Request bodies are read-only inputs; unknown fields are dropped rather than stored.
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+
+class SmsSendRequest(RequestModel):
     phone: str
 
 
-class SmsVerifyRequest(BaseModel):
+class SmsVerifyRequest(RequestModel):
     phone: str
     code: str
 
 
-class RefreshRequest(BaseModel):
+class RefreshRequest(RequestModel):
     refresh_token: str
 
 
-class LogoutRequest(BaseModel):
+class LogoutRequest(RequestModel):
     refresh_token: str
 
 
-class WechatExchangeRequest(BaseModel):
+class WechatExchangeRequest(RequestModel):
     one_time_code: str
 
 
-class CollectionCreateRequest(BaseModel):
+class CollectionCreateRequest(RequestModel):
     name: str
 
 
-class CollectionUpdateRequest(BaseModel):
+class CollectionUpdateRequest(RequestModel):
     name: Optional[str] = None
 
 
-class ProblemCreateRequest(BaseModel):
+class ProblemCreateRequest(RequestModel):
     collection_id: str
     original_image_url: str
     cropped_image_url: Optional[str] = None
     order_index: Optional[int] = 0
 
 
-class ProblemUpdateRequest(BaseModel):
+class ProblemUpdateRequest(RequestModel):
     ocr_text: Optional[str] = None
     note: Optional[str] = None
-    tags: Optional[Any] = None
+    tags: Optional[List[str]] = None
     order_index: Optional[int] = None
     collection_id: Optional[str] = None
     version: int
 
 
-class UploadPresignRequest(BaseModel):
-    filename: str
+class UploadPresignRequest(RequestModel):
+    filename: Annotated[str, Field(min_length=1, max_length=255)]
     content_type: str
-    size: int
+    size: Annotated[int, Field(gt=0)]
 
 
-class UploadCompleteRequest(BaseModel):
-    object_key: str
+class UploadCompleteRequest(RequestModel):
+    object_key: ObjectKey
 
 
-class OcrRequest(BaseModel):
+class OcrRequest(RequestModel):
     image_url: Optional[str] = None
-    idempotency_key: Optional[str] = None
+    idempotency_key: Optional[IdempotencyKey] = None
 
 
-class ExportPdfRequest(BaseModel):
-    idempotency_key: Optional[str] = None
+class ExportPdfRequest(RequestModel):
+    idempotency_key: Optional[IdempotencyKey] = None
     options: Optional[Any] = None
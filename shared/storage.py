@@ -1,6 +1,7 @@
 import os
 import uuid
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Union
 
 from shared.config import get_settings
 
@@ -10,9 +11,20 @@ def ensure_storage_root() -> None:
     os.makedirs(settings.storage_root, exist_ok=True)
 
 
-def build_object_key(user_id: str, filename: str) -> str:
+@lru_cache(maxsize=10000)
+def user_key_prefix(user_id: Union[uuid.UUID, str]) -> str:
+    # Upload handlers get the user id as a UUID; format each user's prefix once, not per request.
+    return f"user/{user_id}/"
+
+
+def owns_object_key(user_id: Union[uuid.UUID, str], object_key: str) -> bool:
+    prefix = user_key_prefix(user_id)
+    return object_key.startswith(prefix) and "/" not in object_key[len(prefix):] and ".." not in object_key
+
+
+def build_object_key(user_id: Union[uuid.UUID, str], filename: str) -> str:
     ext = os.path.splitext(filename)[1]
-    return f"user/{user_id}/{uuid.uuid4().hex}{ext}"
+    return f"{user_key_prefix(user_id)}{uuid.uuid4().hex}{ext}"
 
 
 def get_local_path(object_key: str) -> str:
@@ -25,7 +37,7 @@ def get_public_url(object_key: str) -> str:
     return f"{settings.public_base_url}/{object_key}"
 
 
-def build_presign_response(user_id: str, filename: str) -> Dict[str, str]:
+def build_presign_response(user_id: Union[uuid.UUID, str], filename: str) -> Dict[str, str]:
     object_key = build_object_key(user_id, filename)
     upload_url = "/api/v1/uploads/direct"
     return {
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from shared.db import Base
+from shared import models  # noqa: F401
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    test_db_url = os.getenv("TEST_DATABASE_URL")
+    if not test_db_url:
+        pytest.skip("TEST_DATABASE_URL not configured")
+    engine = create_engine(test_db_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    # Each test runs inside one outer transaction that is rolled back afterwards; commits made by
+    # the code under test only release savepoints, so the schema is built once per session.
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
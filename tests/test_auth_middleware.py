@@ -0,0 +1,57 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from services.api.middleware import auth as auth_middleware
+from services.api.security.jwt_verify import TokenVerificationError
+
+
+def _client(monkeypatch):
+    def fake_verify(token):
+        if token != "good":
+            raise TokenVerificationError("invalid token")
+        return {"sub": "sub-1"}
+
+    monkeypatch.setattr(auth_middleware, "verify_bearer_token", fake_verify)
+    app = FastAPI()
+    app.add_middleware(auth_middleware.AuthMiddleware)
+
+    @app.get("/whoami")
+    def whoami(request: Request):
+        return {"sub": getattr(request.state, "external_sub", None)}
+
+    return TestClient(app)
+
+
+def test_valid_token_populates_request_state(monkeypatch):
+    response = _client(monkeypatch).get("/whoami", headers={"Authorization": "Bearer good"})
+
+    assert response.status_code == 200
+    assert response.json() == {"sub": "sub-1"}
+
+
+def test_malformed_or_invalid_tokens_are_rejected(monkeypatch):
+    client = _client(monkeypatch)
+
+    for header in ("Basic abc", "Bearer ", "Bearer bad"):
+        response = client.get("/whoami", headers={"Authorization": header})
+        assert response.status_code == 401
+        assert response.json()["code"] == 401
+
+
+def test_request_id_is_echoed_or_generated(monkeypatch):
+    client = _client(monkeypatch)
+
+    echoed = client.get("/whoami", headers={"X-Request-Id": "req-1", "Authorization": "Bearer bad"})
+    assert echoed.headers["x-request-id"] == "req-1"
+    assert echoed.json()["request_id"] == "req-1"
+
+    generated = client.get("/whoami")
+    assert len(generated.headers["x-request-id"]) == 32
+
+
+def test_unauthorized_body_escapes_request_id(monkeypatch):
+    response = _client(monkeypatch).get(
+        "/whoami", headers={"X-Request-Id": 'req-"1', "Authorization": "Bearer bad"}
+    )
+
+    assert response.json() == {"code": 401, "message": "invalid token", "data": None, "request_id": 'req-"1'}
@@ -1,17 +1,20 @@
 import base64
 import importlib
 import os
+import uuid
 from datetime import datetime, timedelta, timezone
 
 import jwt
 import pytest
 from cryptography.hazmat.primitives.asymmetric import rsa
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.sql import Delete
 
+from services.api.deps import auth
+from services.api.deps.db import get_db
+from shared import cache
 from shared.config import get_settings
-from shared.db import Base
 from shared.models import AuthIdentity, User
 
 
@@ -38,6 +41,9 @@ def _build_jwks(public_key, kid: str) -> dict:
 
 def _mock_jwks(monkeypatch, jwks: dict):
     class DummyResponse:
+        status_code = 200
+        headers = {}
+
         def __init__(self, payload):
             self._payload = payload
 
@@ -47,16 +53,14 @@ def _mock_jwks(monkeypatch, jwks: dict):
         def raise_for_status(self):
             return None
 
-    def fake_get(url, timeout):
+    def fake_get(self, url, headers=None):
         return DummyResponse(jwks)
 
-    monkeypatch.setattr("httpx.get", fake_get)
+    monkeypatch.setattr("httpx.Client.get", fake_get)
 
 
-@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not configured")
-def test_auto_provisioning_creates_user(monkeypatch):
-    test_db_url = os.getenv("TEST_DATABASE_URL")
-    monkeypatch.setenv("LEARNHUB_DATABASE_URL", test_db_url)
+def test_auto_provisioning_creates_user(monkeypatch, db_session):
+    monkeypatch.setenv("LEARNHUB_DATABASE_URL", os.environ["TEST_DATABASE_URL"])
     monkeypatch.setenv("LEARNHUB_BETTER_AUTH_JWKS_URL", "http://jwks.local")
     monkeypatch.setenv("LEARNHUB_BETTER_AUTH_ISSUER", "https://issuer")
     monkeypatch.setenv("LEARNHUB_AUTH_DEV_BYPASS", "false")
@@ -65,10 +69,7 @@ def test_auto_provisioning_creates_user(monkeypatch):
     from services.api.security import jwks_client
 
     jwks_client._jwks_client = None
-
-    engine = create_engine(test_db_url)
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
+    cache.clear_local_cache()
 
     private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
     public_key = private_key.public_key()
@@ -92,13 +93,64 @@ def test_auto_provisioning_creates_user(monkeypatch):
     import services.api.main as main
 
     importlib.reload(main)
+    monkeypatch.setitem(main.app.dependency_overrides, get_db, lambda: db_session)
     client = TestClient(main.app)
     response = client.get("/api/v1/me", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 200
 
-    session = Session(engine)
-    identity = session.query(AuthIdentity).filter(AuthIdentity.provider_uid == "user-sub-1").first()
+    identity = db_session.query(AuthIdentity).filter(AuthIdentity.provider_uid == "user-sub-1").first()
     assert identity is not None
-    user = session.query(User).filter(User.id == identity.user_id).first()
+    user = db_session.query(User).filter(User.id == identity.user_id).first()
     assert user.nickname == "User One"
-    session.close()
+
+
+class _FakeProvisionSession:
+    def __init__(self, user_id, new_user_id):
+        self.row = (user_id, new_user_id)
+        self.statements = []
+        self.committed = False
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        row = self.row
+
+        class Result:
+            def one(self):
+                return row
+
+        return Result()
+
+    def commit(self):
+        self.committed = True
+
+
+def test_provisioning_keeps_new_user_without_conflict():
+    user_id = uuid.uuid4()
+    db = _FakeProvisionSession(user_id, user_id)
+
+    assert auth._provision_identity_user_id(db, "better-auth", "sub-1", {}) == user_id
+
+    assert len(db.statements) == 1
+    assert db.committed
+
+
+def test_provisioning_removes_orphan_user_on_conflict():
+    winner_id, orphan_id = uuid.uuid4(), uuid.uuid4()
+    db = _FakeProvisionSession(winner_id, orphan_id)
+
+    assert auth._provision_identity_user_id(db, "better-auth", "sub-1", {}) == winner_id
+
+    assert len(db.statements) == 2
+    delete_stmt = db.statements[1]
+    assert isinstance(delete_stmt, Delete)
+    assert delete_stmt.compile().params == {"id_1": orphan_id}
+    assert db.committed
+
+
+def test_provisioning_same_sub_twice_creates_one_user(db_session):
+    first = auth._provision_identity_user_id(db_session, "better-auth", "race-sub", {"name": "Racer"})
+    # A second first-login for the same sub, as if it had raced past the identity lookup.
+    second = auth._provision_identity_user_id(db_session, "better-auth", "race-sub", {"name": "Racer"})
+
+    assert first == second
+    assert db_session.scalar(select(func.count()).select_from(User)) == 1
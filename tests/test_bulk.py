@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import select
+
+from shared import bulk
+from shared.models import Collection, Problem, User
+
+
+def test_copy_buffer_escapes_fields_and_applies_defaults():
+    rows = [
+        {
+            "user_id": "u-1",
+            "collection_id": "c-1",
+            "original_image_url": "https://example.com/a.png",
+            "ocr_text": "line one\nline\ttwo \\ end",
+        }
+    ]
+
+    line = bulk._copy_buffer(rows).read()
+
+    assert line == (
+        "u-1\tc-1\tDRAFT\thttps://example.com/a.png\t\\N\tline one\\nline\\ttwo \\\\ end\t\\N\t\\N\t\\N\t0\t1\n"
+    )
+
+
+def test_copy_buffer_encodes_tags_and_ocr_raw():
+    rows = [
+        {
+            "user_id": "u-1",
+            "collection_id": "c-1",
+            "original_image_url": "x",
+            "ocr_raw": {"text": "a\nb"},
+            "tags": ["math", 'say "hi"'],
+        }
+    ]
+
+    fields = bulk._copy_buffer(rows).read().rstrip("\n").split("\t")
+
+    assert fields[6] == '{"text":"a\\\\nb"}'
+    assert fields[8] == '{"math","say \\\\"hi\\\\""}'
+
+
+def test_copy_rejects_unknown_columns():
+    rows = [{"user_id": "u", "collection_id": "c", "original_image_url": "x", "bogus": 1}] * bulk.COPY_THRESHOLD
+
+    with pytest.raises(ValueError, match="bogus"):
+        bulk.insert_problems(object(), rows)
+
+
+def test_small_batches_use_insert(monkeypatch):
+    executed = []
+
+    class FakeSession:
+        def execute(self, stmt, params):
+            executed.append(params)
+
+        def connection(self):
+            raise AssertionError("COPY should not be used below the threshold")
+
+    rows = [{"user_id": "u", "collection_id": "c", "original_image_url": "x"}]
+    bulk.insert_problems(FakeSession(), rows)
+
+    assert executed == [rows]
+
+
+def test_copy_ingest_stores_every_column(db_session):
+    user = User(nickname="bulk-user")
+    db_session.add(user)
+    db_session.flush()
+    collection = Collection(user_id=user.id, name="Bulk")
+    db_session.add(collection)
+    db_session.flush()
+    rows = [
+        {"user_id": user.id, "collection_id": collection.id, "original_image_url": f"https://example.com/{index}.png"}
+        for index in range(bulk.COPY_THRESHOLD + 1)
+    ]
+    rows[0].update(tags=["algebra", 'quote "x"'], ocr_raw={"lines": ["a\tb", "c\\d"]}, note="first")
+
+    bulk.insert_problems(db_session, rows)
+
+    stored = db_session.execute(
+        select(Problem.tags, Problem.ocr_raw, Problem.note, Problem.status, Problem.version)
+        .where(Problem.collection_id == collection.id)
+        .order_by(Problem.note.is_(None))
+    ).all()
+    assert len(stored) == bulk.COPY_THRESHOLD + 1
+    assert stored[0] == (["algebra", 'quote "x"'], {"lines": ["a\tb", "c\\d"]}, "first", "DRAFT", 1)
+    assert all(row.status == "DRAFT" and row.version == 1 for row in stored)
@@ -0,0 +1,120 @@
+import pytest
+import redis
+
+from shared import cache
+from shared.config import get_settings
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_cache():
+    cache.clear_local_cache()
+    yield
+    cache.clear_local_cache()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+
+class BrokenRedis:
+    def get(self, key):
+        raise redis.ConnectionError("down")
+
+    def setex(self, key, ttl, value):
+        raise redis.ConnectionError("down")
+
+
+def test_cached_user_id_round_trip(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, "get_redis", lambda: fake)
+
+    assert cache.get_cached_user_id("better_auth", "sub-1") is None
+    cache.set_cached_user_id("better_auth", "sub-1", "user-1")
+
+    assert cache.get_cached_user_id("better_auth", "sub-1") == "user-1"
+    assert fake.ttls["auth:better_auth:sub-1"] == get_settings().auth_identity_cache_ttl_seconds
+
+
+def test_cache_fails_open_when_redis_unavailable(monkeypatch):
+    monkeypatch.setattr(cache, "get_redis", lambda: BrokenRedis())
+
+    assert cache.get_cached_user_id("better_auth", "sub-1") is None
+    cache.set_cached_user_id("better_auth", "sub-1", "user-1")
+    assert cache.get_cached_user_id("better_auth", "sub-1") == "user-1"
+
+
+def test_redis_is_skipped_after_a_failure(monkeypatch):
+    calls = []
+
+    def broken():
+        calls.append(1)
+        return BrokenRedis()
+
+    monkeypatch.setattr(cache, "get_redis", broken)
+
+    assert cache.get_cached_user_id("better_auth", "sub-1") is None
+    assert cache.get_cached_user_id("better_auth", "sub-2") is None
+    cache.set_cached_user_id("better_auth", "sub-2", "user-2")
+
+    assert len(calls) == 1
+
+
+def test_redis_is_retried_after_backoff(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(cache, "get_redis", lambda: BrokenRedis())
+    assert cache.get_cached_user_id("better_auth", "sub-1") is None
+
+    fake = FakeRedis()
+    fake.store["auth:better_auth:sub-1"] = "user-1"
+    monkeypatch.setattr(cache, "get_redis", lambda: fake)
+    now[0] += cache._ERROR_BACKOFF_SECONDS
+    assert cache.get_cached_user_id("better_auth", "sub-1") == "user-1"
+
+
+def test_redis_failures_warn_once_per_backoff_window(monkeypatch, caplog):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(cache, "get_redis", lambda: BrokenRedis())
+
+    with caplog.at_level("WARNING", logger=cache.logger.name):
+        cache.get_cached_user_id("better_auth", "sub-1")
+        # A concurrent request that was already waiting on Redis when the window opened.
+        cache._back_off_redis("write")
+        cache.get_cached_user_id("better_auth", "sub-2")
+        assert len(caplog.records) == 1
+
+        now[0] += cache._ERROR_BACKOFF_SECONDS
+        cache.get_cached_user_id("better_auth", "sub-3")
+        assert len(caplog.records) == 2
+
+
+def test_redis_hits_are_served_locally_afterwards(monkeypatch):
+    fake = FakeRedis()
+    fake.store["auth:better_auth:sub-1"] = "user-1"
+    monkeypatch.setattr(cache, "get_redis", lambda: fake)
+    assert cache.get_cached_user_id("better_auth", "sub-1") == "user-1"
+
+    monkeypatch.setattr(cache, "get_redis", lambda: BrokenRedis())
+    assert cache.get_cached_user_id("better_auth", "sub-1") == "user-1"
+
+
+def test_cached_profile_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    profile = {"id": "user-1", "nickname": "n", "avatar_url": None}
+
+    cache.set_cached_profile("user-1", profile)
+    assert cache.get_cached_profile("user-1") == profile
+
+    now[0] += get_settings().user_profile_cache_ttl_seconds
+    assert cache.get_cached_profile("user-1") is None
@@ -6,6 +6,7 @@ import jwt
 import pytest
 from cryptography.hazmat.primitives.asymmetric import rsa
 
+from services.api.security import jwt_verify
 from services.api.security.jwt_verify import TokenVerificationError, verify_bearer_token
 from shared.config import get_settings
 
@@ -33,6 +34,9 @@ def _build_jwks(public_key, kid: str) -> dict:
 
 def _mock_jwks(monkeypatch, jwks: dict):
     class DummyResponse:
+        status_code = 200
+        headers = {}
+
         def __init__(self, payload):
             self._payload = payload
 
@@ -42,10 +46,10 @@ def _mock_jwks(monkeypatch, jwks: dict):
         def raise_for_status(self):
             return None
 
-    def fake_get(url, timeout):
+    def fake_get(self, url, headers=None):
         return DummyResponse(jwks)
 
-    monkeypatch.setattr("httpx.get", fake_get)
+    monkeypatch.setattr("httpx.Client.get", fake_get)
 
 
 @pytest.fixture(autouse=True)
@@ -57,9 +61,11 @@ def _reset_settings_cache(monkeypatch):
     from services.api.security import jwks_client
 
     jwks_client._jwks_client = None
+    jwt_verify._verified_tokens.clear()
     yield
     get_settings.cache_clear()
     jwks_client._jwks_client = None
+    jwt_verify._verified_tokens.clear()
 
 
 @pytest.fixture
@@ -153,3 +159,58 @@ def test_verify_bearer_token_invalid_audience(monkeypatch, rsa_keys):
 
     with pytest.raises(TokenVerificationError):
         verify_bearer_token(token)
+
+
+def test_verified_token_is_served_from_cache(monkeypatch, rsa_keys):
+    private_key, public_key = rsa_keys
+    kid = "kid-5"
+    _mock_jwks(monkeypatch, _build_jwks(public_key, kid))
+
+    token = jwt.encode(
+        {
+            "sub": "user-1",
+            "iss": "https://issuer",
+            "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": kid},
+    )
+    assert verify_bearer_token(token)["sub"] == "user-1"
+
+    def fail_verify(token):
+        raise AssertionError("signature re-verified")
+
+    monkeypatch.setattr(jwt_verify, "_verify_signature", fail_verify)
+    assert verify_bearer_token(token)["sub"] == "user-1"
+
+
+def test_jwks_refresh_revalidates_with_etag(monkeypatch, rsa_keys):
+    from services.api.security.jwks_client import JWKSClient
+
+    _, public_key = rsa_keys
+    jwks = _build_jwks(public_key, "kid-6")
+    sent_headers = []
+
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+            self.headers = {"etag": '"v1"'}
+
+        def json(self):
+            return jwks
+
+        def raise_for_status(self):
+            return None
+
+    def fake_get(self, url, headers=None):
+        sent_headers.append(headers)
+        return Response(304 if headers else 200)
+
+    monkeypatch.setattr("httpx.Client.get", fake_get)
+    client = JWKSClient("http://jwks.local", cache_ttl=0)
+
+    client.get_public_key("kid-6")
+    client.get_public_key("kid-6")
+
+    assert sent_headers == [{}, {"If-None-Match": '"v1"'}]
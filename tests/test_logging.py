@@ -0,0 +1,82 @@
+import json
+import logging
+import sys
+
+from shared.logging import (
+    REQUEST_ID,
+    BufferedStreamHandler,
+    JsonFormatter,
+    RequestIdFilter,
+    configure_logging,
+    stop_logging,
+)
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("learnhub", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_request_id_filter_injects_context_request_id():
+    token = REQUEST_ID.set("req-1")
+    try:
+        record = _record("hello")
+        RequestIdFilter().filter(record)
+    finally:
+        REQUEST_ID.reset(token)
+
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload == {"level": "INFO", "message": "hello", "logger": "learnhub", "request_id": "req-1"}
+
+
+def test_request_id_omitted_outside_request():
+    record = _record("hello")
+    RequestIdFilter().filter(record)
+
+    payload = json.loads(JsonFormatter().format(record))
+    assert "request_id" not in payload
+
+
+def test_buffered_handler_defers_info_and_flushes_warnings():
+    class Stream:
+        def __init__(self):
+            self.lines = []
+            self.flushes = 0
+
+        def write(self, text):
+            self.lines.append(text)
+
+        def flush(self):
+            self.flushes += 1
+
+    stream = Stream()
+    handler = BufferedStreamHandler(stream, flush_interval=60)
+    try:
+        handler.handle(_record("hello"))
+        assert stream.lines == ["hello\n"]
+        assert stream.flushes == 0
+
+        warning = _record("careful")
+        warning.levelno = logging.WARNING
+        handler.handle(warning)
+        assert stream.flushes == 1
+    finally:
+        handler.close()
+
+
+def test_configure_logging_keeps_caller_request_id(capsys):
+    root = logging.getLogger()
+    previous_handlers, previous_level = root.handlers[:], root.level
+    configure_logging()
+    token = REQUEST_ID.set("req-2")
+    try:
+        logging.getLogger("learnhub").info("queued")
+    finally:
+        REQUEST_ID.reset(token)
+        stop_logging()
+        root.handlers[:] = previous_handlers
+        root.setLevel(previous_level)
+    sys.stdout.flush()
+
+    payload = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert payload["message"] == "queued"
+    assert payload["request_id"] == "req-2"
@@ -0,0 +1,100 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import redis
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from services.api.deps import rate_limit
+from services.api.deps.rate_limit import RateLimiter
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def register_script(self, script):
+        async def run(keys, args, client):
+            client.store[keys[0]] = client.store.get(keys[0], 0) + 1
+            return client.store[keys[0]]
+
+        return run
+
+
+class BrokenRedis:
+    def register_script(self, script):
+        raise redis.ConnectionError("down")
+
+
+def _request(redis_client, path="/api/v1/jobs/1", client=("10.0.0.1", 1234)):
+    app = SimpleNamespace(state=SimpleNamespace(redis=redis_client))
+    return Request({"type": "http", "app": app, "method": "GET", "path": path, "headers": [], "client": client})
+
+
+def test_rate_limiter_rejects_after_limit():
+    fake = FakeRedis()
+    limiter = RateLimiter(times=2, seconds=60)
+
+    asyncio.run(limiter(_request(fake)))
+    asyncio.run(limiter(_request(fake)))
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(limiter(_request(fake)))
+
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) <= 60
+
+
+def test_rate_limiter_sets_headers_on_success():
+    limiter = RateLimiter(times=3, seconds=60)
+    request = _request(FakeRedis())
+
+    asyncio.run(limiter(request))
+
+    assert request.state.rate_limit_headers == {"X-RateLimit-Limit": "3", "X-RateLimit-Remaining": "2"}
+
+
+def test_rate_limiter_keys_per_client():
+    fake = FakeRedis()
+    limiter = RateLimiter(times=1, seconds=60)
+
+    asyncio.run(limiter(_request(fake, client=("10.0.0.1", 1))))
+    asyncio.run(limiter(_request(fake, client=("10.0.0.2", 1))))
+
+
+def test_rate_limiter_uses_current_app_client():
+    first, second = FakeRedis(), FakeRedis()
+    limiter = RateLimiter(times=5, seconds=60)
+
+    asyncio.run(limiter(_request(first)))
+    asyncio.run(limiter(_request(second)))
+
+    assert list(first.store.values()) == [1]
+    assert list(second.store.values()) == [1]
+
+
+def test_rate_limiter_fails_open():
+    limiter = RateLimiter(times=0, seconds=60)
+
+    asyncio.run(limiter(_request(BrokenRedis())))
+
+
+def test_rate_limiter_skips_redis_after_error():
+    limiter = RateLimiter(times=0, seconds=60)
+    asyncio.run(limiter(_request(BrokenRedis())))
+
+    class ExplodingRedis:
+        def register_script(self, script):
+            raise AssertionError("redis should not be called during backoff")
+
+    asyncio.run(limiter(_request(ExplodingRedis())))
+
+
+def test_rate_limiter_warns_once_without_client(caplog):
+    limiter = RateLimiter(times=0, seconds=60)
+
+    with caplog.at_level("WARNING", logger=rate_limit.logger.name):
+        asyncio.run(limiter(_request(None)))
+        asyncio.run(limiter(_request(None)))
+
+    assert len(caplog.records) == 1
@@ -0,0 +1,20 @@
+import uuid
+
+from shared.storage import build_object_key, owns_object_key, user_key_prefix
+
+
+def test_owns_object_key_accepts_generated_keys():
+    assert owns_object_key("user-1", build_object_key("user-1", "photo.png"))
+
+
+def test_owns_object_key_rejects_other_users_and_traversal():
+    assert not owns_object_key("user-1", "user/user-2/a.png")
+    assert not owns_object_key("user-1", "user/user-1/../user-2/a.png")
+    assert not owns_object_key("user-1", "user/user-1/nested/a.png")
+
+
+def test_user_key_prefix_matches_for_uuid_and_str():
+    user_id = uuid.uuid4()
+
+    assert user_key_prefix(user_id) == user_key_prefix(str(user_id)) == f"user/{user_id}/"
+    assert owns_object_key(user_id, build_object_key(str(user_id), "photo.png"))